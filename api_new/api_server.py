@@ -1,16 +1,32 @@
-from fastapi import FastAPI, HTTPException, Depends, Query, Security, BackgroundTasks, Header
+from fastapi import FastAPI, HTTPException, Depends, Query, Security, BackgroundTasks, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any, NamedTuple, Union
+from contextlib import asynccontextmanager, contextmanager
 import sqlite3
 import os
-import subprocess
+import queue
 import json
-from datetime import datetime
+import base64
+import binascii
+import hashlib
+import hmac
+import itertools
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import asyncio
+import functools
+import importlib.util
 import logging
 
+import orjson
+from cachetools import TTLCache
+
+from db_pool import ConnectionPool
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,7 +36,130 @@ logger = logging.getLogger(__name__)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_FILE = os.path.join(BASE_DIR, 'database', 'magang_data.db')
 API_KEY = os.getenv('MAGANG_API_KEY', 'your-secret-api-key-here')  # Change this in production!
-SCRAPER_SCRIPT = os.path.join(BASE_DIR, 'scraper_new', 'scraper.py')
+API_KEY_BYTES = API_KEY.encode()
+SCRAPER_DIR = os.path.join(BASE_DIR, 'scraper_new')
+SCRAPER_SCRIPT = os.path.join(SCRAPER_DIR, 'scraper.py')
+SCRAPER_TIMEOUT = 1800  # 30 minutes
+
+# Connection pool: two readers per CPU (capped) plus a single writer
+DB_READ_POOL_SIZE = min((os.cpu_count() or 4) * 2, 16)
+DB_POOL_TIMEOUT = 10  # seconds to wait for a free connection
+read_pool = ConnectionPool(DB_FILE, size=DB_READ_POOL_SIZE)
+write_pool = ConnectionPool(DB_FILE, size=1)
+prepare_lock = threading.Lock()  # one prepare_database attempt at a time
+
+# Indexes the API relies on, created at startup if missing. The scraper
+# already indexes kategori and mitra individually, which serves the DISTINCT
+# lookups of /categories and /mitras as covering index scans.
+API_INDEXES = (
+    # Lets filtered COUNT(*) scan the short list columns instead of whole rows
+    # (which carry the long detail texts)
+    "CREATE INDEX IF NOT EXISTS ix_list_cover ON lowongan("
+    "last_updated DESC, id_lowongan DESC, posisi, mitra, kategori, lokasi_penempatan)",
+)
+
+# Full-text index for the q search, kept in sync with lowongan by triggers
+FTS_COLUMNS = "posisi, mitra, kategori, deskripsi_singkat"
+FTS_SCHEMA = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS lowongan_fts USING fts5(
+        {FTS_COLUMNS}, content='lowongan', content_rowid='id_lowongan',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS lowongan_fts_ai AFTER INSERT ON lowongan BEGIN
+        INSERT INTO lowongan_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id_lowongan, new.posisi, new.mitra, new.kategori, new.deskripsi_singkat);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS lowongan_fts_ad AFTER DELETE ON lowongan BEGIN
+        INSERT INTO lowongan_fts(lowongan_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id_lowongan, old.posisi, old.mitra, old.kategori, old.deskripsi_singkat);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS lowongan_fts_au AFTER UPDATE ON lowongan BEGIN
+        INSERT INTO lowongan_fts(lowongan_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id_lowongan, old.posisi, old.mitra, old.kategori, old.deskripsi_singkat);
+        INSERT INTO lowongan_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id_lowongan, new.posisi, new.mitra, new.kategori, new.deskripsi_singkat);
+    END""",
+)
+
+# SQL for the list endpoint, one set per combination of active filters, built
+# once so every request with the same filters reuses the exact statement text
+# (and therefore sqlite3's per-connection prepared statement cache)
+LIST_FILTERS = (
+    "id_lowongan IN (SELECT rowid FROM lowongan_fts WHERE lowongan_fts MATCH ?)",  # q
+    "lokasi_penempatan LIKE ?",  # lokasi
+    "mitra LIKE ?",  # mitra
+    "kategori LIKE ?",  # kategori
+)
+LIST_FIELDS = (
+    "id_lowongan", "posisi", "mitra", "kategori", "jumlah_dibutuhkan",
+    "lokasi_penempatan", "deskripsi_singkat", "url_detail", "last_updated"
+)
+LIST_COLUMNS = ", ".join(LIST_FIELDS)
+DETAIL_FIELDS = LIST_FIELDS + (
+    "deskripsi_detail", "tugas_tanggung_jawab", "kualifikasi",
+    "kompetensi_dikembangkan", "created_at"
+)
+MAX_BATCH_IDS = 100
+# Range of an SQLite INTEGER; larger ids cannot be bound or JSON-encoded by orjson
+SQLITE_INT_MIN = -2**63
+SQLITE_INT_MAX = 2**63 - 1
+# One statement for any number of ids: json_each feeds rowid lookups
+BATCH_DETAIL_QUERY = (
+    f"SELECT {', '.join(DETAIL_FIELDS)} FROM lowongan "
+    "WHERE id_lowongan IN (SELECT value FROM json_each(?))"
+)
+# Seek past the cursor row instead of scanning and discarding offset rows.
+# id_lowongan is the rowid, so idx_last_updated already orders by
+# (last_updated, id_lowongan) and the row-value comparison is a range scan.
+KEYSET_CONDITION = "(last_updated, id_lowongan) < (?, ?)"
+
+def _where(conditions) -> str:
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+def _build_list_queries() -> Dict[tuple, tuple]:
+    """Map each filter shape to its (count, offset page, keyset page) SQL"""
+    queries = {}
+    for shape in itertools.product((False, True), repeat=len(LIST_FILTERS)):
+        conditions = [sql for sql, active in zip(LIST_FILTERS, shape) if active]
+        select = f"SELECT {LIST_COLUMNS} FROM lowongan"
+        order = " ORDER BY last_updated DESC, id_lowongan DESC"
+        queries[shape] = (
+            "SELECT COUNT(*) as total FROM lowongan" + _where(conditions),
+            select + _where(conditions) + order + " LIMIT ? OFFSET ?",
+            select + _where(conditions + [KEYSET_CONDITION]) + order + " LIMIT ?",
+        )
+    return queries
+
+LIST_QUERIES = _build_list_queries()
+
+# Cache for responses that only change when the scraper runs
+RESPONSE_CACHE_TTL = 600  # seconds
+response_cache = TTLCache(maxsize=16, ttl=RESPONSE_CACHE_TTL)
+
+# Filtered totals for include_total=true, keyed by (q, lokasi, mitra, kategori)
+COUNT_CACHE_TTL = 60  # seconds
+count_cache = TTLCache(maxsize=1024, ttl=COUNT_CACHE_TTL)
+
+# Detail records only change when the scraper rewrites them
+DETAIL_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=600"
+
+# Application lifespan
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the connection pools on startup and close them on shutdown"""
+    os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
+    app.state.db_exists = os.path.exists(DB_FILE)
+    app.state.db_prepared = False  # set by try_prepare_database once it succeeds
+    if app.state.db_exists:
+        # Warm up the pools and create the API indexes / FTS table if missing
+        read_pool.open()
+        write_pool.open()
+        try_prepare_database()
+    try:
+        yield
+    finally:
+        read_pool.close()
+        write_pool.close()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -28,7 +167,9 @@ app = FastAPI(
     description="API untuk mengakses data lowongan magang dari Simbelmawa",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -40,8 +181,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses (list pages are highly compressible)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Pydantic models
 class LowonganSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra='ignore')
+    
     id_lowongan: int
     posisi: str
     mitra: str
@@ -62,8 +208,9 @@ class LowonganDetail(LowonganSummary):
 class LowonganListResponse(BaseModel):
     query: Dict[str, Any]
     count: int
-    total_in_db: int
-    data: List[LowonganSummary]
+    total_in_db: Optional[int] = None
+    next_cursor: Optional[str] = None
+    data: List[Union[LowonganDetail, LowonganSummary]]  # details in ids batch mode
 
 class StatsResponse(BaseModel):
     total_lowongan: int
@@ -77,23 +224,205 @@ class TriggerScrapeResponse(BaseModel):
     message: str
     status: str
 
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: Optional[str]
+
 # Database helper functions
-def get_db_connection():
-    """Get database connection with error handling"""
-    if not os.path.exists(DB_FILE):
+def database_file_exists() -> bool:
+    """Whether the database file exists, without touching the database
+    
+    Once the file exists the answer is served from app.state.db_exists; the
+    filesystem is only checked again while it is missing or after a failed
+    connection attempt. Cheap enough to call on the event loop.
+    """
+    return app.state.db_exists or os.path.exists(DB_FILE)
+
+def database_available(prepare: bool = True) -> bool:
+    """Whether the database file exists, preparing it until that succeeds
+    
+    Blocking: while the database is not prepared (first scrape finished after
+    startup, or an earlier attempt failed, e.g. on a locked database) this runs
+    prepare_database, so only call it from worker threads (it is reached
+    through run_query).
+    """
+    if not app.state.db_exists:
+        if not os.path.exists(DB_FILE):
+            return False
+        app.state.db_exists = True
+    
+    if prepare and not app.state.db_prepared:
+        try_prepare_database()
+    return True
+
+@contextmanager
+def get_db_connection(write: bool = False, prepare: bool = True):
+    """Borrow a pooled database connection with error handling"""
+    if not database_available(prepare):
         raise HTTPException(status_code=503, detail="Database not found. Please run scraper first.")
     
+    pool = write_pool if write else read_pool
     try:
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
-        return conn
+        conn = pool.get(timeout=DB_POOL_TIMEOUT)
     except sqlite3.Error as e:
+        if not os.path.exists(DB_FILE):
+            app.state.db_exists = False
+            raise HTTPException(status_code=503, detail="Database not found. Please run scraper first.")
         logger.error(f"Database connection error: {e}")
         raise HTTPException(status_code=503, detail="Database connection failed")
+    except queue.Empty:
+        logger.error("Timed out waiting for a free database connection")
+        raise HTTPException(status_code=503, detail="Database busy, please retry")
+    
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+def _run_with_connection(query_func, *args):
+    """Call query_func with a borrowed connection"""
+    with get_db_connection() as conn:
+        return query_func(conn, *args)
+
+async def run_query(query_func, *args):
+    """Run a synchronous query helper on a pooled connection in a worker thread
+    
+    The connection is borrowed and returned inside the worker thread so a
+    saturated pool never blocks the event loop.
+    """
+    return await asyncio.to_thread(_run_with_connection, query_func, *args)
+
+def prepare_database():
+    """Create the indexes and full-text table used by the API"""
+    with get_db_connection(write=True, prepare=False) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in API_INDEXES:
+                conn.execute(statement)
+            
+            fts_exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lowongan_fts'"
+            ).fetchone()
+            for statement in FTS_SCHEMA:
+                conn.execute(statement)
+            if not fts_exists:
+                logger.info("Building full-text index lowongan_fts")
+                conn.execute("INSERT INTO lowongan_fts(lowongan_fts) VALUES ('rebuild')")
+            
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+def try_prepare_database():
+    """Run prepare_database, logging instead of raising on failure
+    
+    app.state.db_prepared is only set on success, so a failed attempt is
+    retried by the next request. Requests arriving while another thread is
+    preparing do not wait for it.
+    """
+    if not prepare_lock.acquire(blocking=False):
+        return
+    try:
+        if not app.state.db_prepared:
+            prepare_database()
+            app.state.db_prepared = True
+    except (sqlite3.Error, HTTPException) as e:
+        logger.warning(f"Could not prepare database indexes: {e}")
+    finally:
+        prepare_lock.release()
+
+def _query_last_scrape_timestamp(conn) -> Optional[str]:
+    """Fetch the timestamp of the latest scrape"""
+    row = conn.execute(
+        "SELECT last_scrape_timestamp FROM scrape_metadata ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    return row['last_scrape_timestamp'] if row else None
+
+def http_date(timestamp: Optional[str]) -> Optional[str]:
+    """Format a stored ISO timestamp (local time) as an HTTP date"""
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    return format_datetime(parsed.astimezone(timezone.utc), usegmt=True)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[str]) -> bool:
+    """Check an If-Modified-Since header against a Last-Modified HTTP date"""
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+def invalidate_response_cache():
+    """Drop all cached responses, e.g. after the scraper refreshed the data"""
+    response_cache.clear()
+    count_cache.clear()
+
+async def cached_json_response(request: Request, key: str, query_func) -> Response:
+    """Serve query_func's JSON payload from the TTL cache with validators
+    
+    query_func returns (payload, last_scrape_timestamp). Clients presenting
+    a matching If-None-Match get an empty 304.
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        payload, last_scrape = await run_query(query_func)
+        body = orjson.dumps(payload)
+        entry = CachedResponse(
+            body=body,
+            # Weak: GZipMiddleware may serve this body gzip- or identity-encoded
+            etag='W/"' + hashlib.sha1(body).hexdigest() + '"',
+            last_modified=http_date(last_scrape)
+        )
+        response_cache[key] = entry
+    
+    headers = {
+        "Cache-Control": f"public, max-age={RESPONSE_CACHE_TTL}",
+        "ETag": entry.etag
+    }
+    if entry.last_modified:
+        headers["Last-Modified"] = entry.last_modified
+    
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def build_match_query(q: str) -> str:
+    """Turn free text into an FTS5 query where every word must match as a prefix"""
+    return " ".join('"' + token.replace('"', '""') + '"*' for token in q.split())
+
+def encode_cursor(last_updated: str, id_lowongan: int) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor"""
+    raw = json.dumps([last_updated, id_lowongan], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        last_updated, id_lowongan = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(last_updated, str) or not is_sqlite_int(id_lowongan):
+            raise ValueError("unexpected cursor payload")
+        return last_updated, id_lowongan
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 def verify_api_key(x_api_key: str = Header(None)):
     """Verify API key for protected endpoints"""
-    if x_api_key != API_KEY:
+    # Constant-time comparison so response timing does not leak the key
+    if not x_api_key or not hmac.compare_digest(x_api_key.encode(), API_KEY_BYTES):
         raise HTTPException(status_code=401, detail="Invalid API key")
     return x_api_key
 
@@ -113,163 +442,279 @@ async def root():
         }
     }
 
+def _query_lowongan_list(conn, q, lokasi, mitra, kategori, limit, offset, after, count_total):
+    """Fetch one page of lowongan matching the filters
+    
+    When after is a (last_updated, id_lowongan) sort key the page starts right
+    after that row (keyset pagination) and offset is ignored. The filtered
+    total is only counted when count_total is set (None otherwise). Page rows
+    are plain tuples in LIST_FIELDS order.
+    """
+    # Bind values in LIST_FILTERS order; unset filters are skipped
+    filter_values = (
+        build_match_query(q) if q else None,
+        f"%{lokasi}%" if lokasi else None,
+        f"%{mitra}%" if mitra else None,
+        f"%{kategori}%" if kategori else None,
+    )
+    shape = tuple(bool(value) for value in filter_values)
+    params = [value for value in filter_values if value]
+    count_query, page_query, seek_query = LIST_QUERIES[shape]
+    
+    # Get total count
+    total_in_db = None
+    if count_total:
+        total_result = conn.execute(count_query, params).fetchone()
+        total_in_db = total_result['total'] if total_result else 0
+    
+    # Get paginated results, skipping sqlite3.Row's per-field name lookups
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    if after:
+        cursor.execute(seek_query, [*params, *after, limit])
+    else:
+        cursor.execute(page_query, [*params, limit, offset])
+    return total_in_db, cursor.fetchall()
+
+def is_sqlite_int(value) -> bool:
+    """Whether value is an int (not a bool) that fits an SQLite INTEGER"""
+    return type(value) is int and SQLITE_INT_MIN <= value <= SQLITE_INT_MAX
+
+def parse_ids(ids: str) -> List[int]:
+    """Parse a comma-separated ID list, dropping duplicates but keeping order"""
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not all(is_sqlite_int(id_lowongan) for id_lowongan in parsed):
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    parsed = list(dict.fromkeys(parsed))
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must contain at least one ID")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
+def _query_lowongan_batch(conn, ids):
+    """Fetch detail rows for the given IDs as tuples in DETAIL_FIELDS order"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(BATCH_DETAIL_QUERY, (json.dumps(ids),))
+    return cursor.fetchall()
+
 @app.get("/api/v1/lowongan", response_model=LowonganListResponse)
 async def get_lowongan_list(
-    q: Optional[str] = Query(None, description="Search query for posisi, mitra, or kategori"),
+    q: Optional[str] = Query(None, description="Search query for posisi, mitra, kategori, or deskripsi singkat"),
     lokasi: Optional[str] = Query(None, description="Filter by location"),
     mitra: Optional[str] = Query(None, description="Filter by mitra"),
     kategori: Optional[str] = Query(None, description="Filter by kategori"),
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
-    offset: int = Query(0, ge=0, description="Number of results to skip")
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Pagination cursor taken from next_cursor of the previous page"),
+    include_total: bool = Query(False, description="Also count all matching lowongan (total_in_db)"),
+    ids: Optional[str] = Query(None, description="Comma-separated IDs (max 100); returns their detail records instead of a filtered page")
 ):
     """
     Get list of lowongan with filtering and pagination
     
-    - **q**: Free text search across posisi, mitra, and kategori
+    - **q**: Free text search across posisi, mitra, kategori, and deskripsi singkat (every word must match, prefixes allowed)
     - **lokasi**: Filter by location text
     - **mitra**: Filter by specific mitra
     - **kategori**: Filter by specific kategori
     - **limit**: Maximum results per page (1-100)
     - **offset**: Number of results to skip for pagination
+    - **cursor**: Continue after the previous page (preferred over offset for deep pages)
+    - **include_total**: Fill total_in_db with the number of matching lowongan (extra query, cached briefly)
+    - **ids**: Batch mode; fetch detail records for these IDs in one request (other parameters are ignored)
     """
-    conn = get_db_connection()
+    if ids is not None:
+        return await get_lowongan_batch(parse_ids(ids))
+    
+    after = decode_cursor(cursor) if cursor else None
+    
+    count_key = (q, lokasi, mitra, kategori)
+    cached_total = count_cache.get(count_key) if include_total else None
+    count_total = include_total and cached_total is None
     
     try:
-        # Build dynamic query
-        where_conditions = []
-        params = []
-        
-        if q:
-            where_conditions.append("(posisi LIKE ? OR mitra LIKE ? OR kategori LIKE ?)")
-            search_term = f"%{q}%"
-            params.extend([search_term, search_term, search_term])
-        
-        if lokasi:
-            where_conditions.append("lokasi_penempatan LIKE ?")
-            params.append(f"%{lokasi}%")
-            
-        if mitra:
-            where_conditions.append("mitra LIKE ?")
-            params.append(f"%{mitra}%")
-            
-        if kategori:
-            where_conditions.append("kategori LIKE ?")
-            params.append(f"%{kategori}%")
-        
-        where_clause = ""
-        if where_conditions:
-            where_clause = "WHERE " + " AND ".join(where_conditions)
-        
-        # Get total count
-        count_query = f"SELECT COUNT(*) as total FROM lowongan {where_clause}"
-        total_result = conn.execute(count_query, params).fetchone()
-        total_in_db = total_result['total'] if total_result else 0
-        
-        # Get paginated results
-        main_query = f"""
-            SELECT id_lowongan, posisi, mitra, kategori, jumlah_dibutuhkan, 
-                   lokasi_penempatan, deskripsi_singkat, url_detail, last_updated
-            FROM lowongan 
-            {where_clause}
-            ORDER BY last_updated DESC, id_lowongan DESC
-            LIMIT ? OFFSET ?
-        """
-        
-        params.extend([limit, offset])
-        cursor = conn.execute(main_query, params)
-        results = cursor.fetchall()
-        
-        # Convert to response format
-        lowongan_list = []
-        for row in results:
-            lowongan_list.append(LowonganSummary(
-                id_lowongan=row['id_lowongan'],
-                posisi=row['posisi'],
-                mitra=row['mitra'],
-                kategori=row['kategori'],
-                jumlah_dibutuhkan=row['jumlah_dibutuhkan'],
-                lokasi_penempatan=row['lokasi_penempatan'],
-                deskripsi_singkat=row['deskripsi_singkat'],
-                url_detail=row['url_detail'],
-                last_updated=row['last_updated']
-            ))
-        
-        return LowonganListResponse(
-            query={
-                "q": q,
-                "lokasi": lokasi,
-                "mitra": mitra,
-                "kategori": kategori,
-                "limit": limit,
-                "offset": offset
-            },
-            count=len(lowongan_list),
-            total_in_db=total_in_db,
-            data=lowongan_list
+        total_in_db, results = await run_query(
+            _query_lowongan_list, q, lokasi, mitra, kategori, limit, offset, after, count_total
         )
-        
     except sqlite3.Error as e:
         logger.error(f"Database query error: {e}")
         raise HTTPException(status_code=500, detail="Database query failed")
-    finally:
-        conn.close()
+    
+    if count_total:
+        count_cache[count_key] = total_in_db
+    elif include_total:
+        total_in_db = cached_total
+    
+    # Convert to response format; rows come from our own schema, so they are
+    # serialized directly instead of going through Pydantic validation
+    lowongan_list = [dict(zip(LIST_FIELDS, row)) for row in results]
+    
+    next_cursor = None
+    if len(lowongan_list) == limit:
+        last_row = lowongan_list[-1]
+        next_cursor = encode_cursor(last_row['last_updated'], last_row['id_lowongan'])
+    
+    return ORJSONResponse({
+        "query": {
+            "q": q,
+            "lokasi": lokasi,
+            "mitra": mitra,
+            "kategori": kategori,
+            "limit": limit,
+            "offset": offset,
+            "cursor": cursor,
+            "include_total": include_total
+        },
+        "count": len(lowongan_list),
+        "total_in_db": total_in_db,
+        "next_cursor": next_cursor,
+        "data": lowongan_list
+    })
+
+async def get_lowongan_batch(id_list: List[int]) -> ORJSONResponse:
+    """Respond with the detail records of id_list, in the requested order"""
+    try:
+        results = await run_query(_query_lowongan_batch, id_list)
+    except sqlite3.Error as e:
+        logger.error(f"Database query error: {e}")
+        raise HTTPException(status_code=500, detail="Database query failed")
+    
+    by_id = {row[0]: dict(zip(DETAIL_FIELDS, row)) for row in results}
+    lowongan_list = [by_id[id_lowongan] for id_lowongan in id_list if id_lowongan in by_id]
+    
+    return ORJSONResponse({
+        "query": {"ids": id_list},
+        "count": len(lowongan_list),
+        "total_in_db": None,
+        "next_cursor": None,
+        "data": lowongan_list
+    })
+
+def detail_etag(id_lowongan: int, last_updated: str) -> str:
+    """Weak ETag of a lowongan record, which changes whenever it is re-scraped"""
+    return f'W/"{id_lowongan}-{last_updated}"'
+
+def _query_lowongan_detail(conn, id_lowongan, if_none_match, if_modified_since):
+    """Fetch a single lowongan row by ID unless the client's copy is current
+    
+    Returns None if the ID does not exist, otherwise (last_updated, row)
+    where row is None when the client's copy is still current.
+    """
+    if if_none_match or if_modified_since:
+        # Cheap primary key lookup before reading the long detail columns
+        version = conn.execute(
+            "SELECT last_updated FROM lowongan WHERE id_lowongan = ?", (id_lowongan,)
+        ).fetchone()
+        if version is None:
+            return None
+        last_updated = version['last_updated']
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if if_none_match:
+            fresh = etag_matches(if_none_match, detail_etag(id_lowongan, last_updated))
+        else:
+            fresh = not_modified_since(if_modified_since, http_date(last_updated))
+        if fresh:
+            return last_updated, None
+    
+    query = """
+        SELECT id_lowongan, posisi, mitra, kategori, jumlah_dibutuhkan, 
+               lokasi_penempatan, deskripsi_singkat, url_detail, 
+               deskripsi_detail, tugas_tanggung_jawab, kualifikasi, 
+               kompetensi_dikembangkan, last_updated, created_at
+        FROM lowongan 
+        WHERE id_lowongan = ?
+    """
+    
+    cursor = conn.execute(query, (id_lowongan,))
+    row = cursor.fetchone()
+    return (row['last_updated'], row) if row else None
 
 @app.get("/api/v1/lowongan/{id_lowongan}", response_model=LowonganDetail)
-async def get_lowongan_detail(id_lowongan: int):
+async def get_lowongan_detail(id_lowongan: int, request: Request):
     """
     Get detailed information for a specific lowongan
     
     - **id_lowongan**: The ID of the lowongan to retrieve
-    """
-    conn = get_db_connection()
     
+    Responses carry ETag/Last-Modified; conditional requests for an
+    unchanged record get an empty 304.
+    """
     try:
-        query = """
-            SELECT id_lowongan, posisi, mitra, kategori, jumlah_dibutuhkan, 
-                   lokasi_penempatan, deskripsi_singkat, url_detail, 
-                   deskripsi_detail, tugas_tanggung_jawab, kualifikasi, 
-                   kompetensi_dikembangkan, last_updated, created_at
-            FROM lowongan 
-            WHERE id_lowongan = ?
-        """
-        
-        cursor = conn.execute(query, (id_lowongan,))
-        result = cursor.fetchone()
-        
-        if not result:
-            raise HTTPException(status_code=404, detail=f"Lowongan with ID {id_lowongan} not found")
-        
-        return LowonganDetail(
-            id_lowongan=result['id_lowongan'],
-            posisi=result['posisi'],
-            mitra=result['mitra'],
-            kategori=result['kategori'],
-            jumlah_dibutuhkan=result['jumlah_dibutuhkan'],
-            lokasi_penempatan=result['lokasi_penempatan'],
-            deskripsi_singkat=result['deskripsi_singkat'],
-            url_detail=result['url_detail'],
-            deskripsi_detail=result['deskripsi_detail'],
-            tugas_tanggung_jawab=result['tugas_tanggung_jawab'],
-            kualifikasi=result['kualifikasi'],
-            kompetensi_dikembangkan=result['kompetensi_dikembangkan'],
-            last_updated=result['last_updated'],
-            created_at=result['created_at']
+        result = await run_query(
+            _query_lowongan_detail,
+            id_lowongan,
+            request.headers.get("if-none-match"),
+            request.headers.get("if-modified-since")
         )
-        
     except sqlite3.Error as e:
         logger.error(f"Database query error: {e}")
         raise HTTPException(status_code=500, detail="Database query failed")
-    finally:
-        conn.close()
+    
+    if not result:
+        raise HTTPException(status_code=404, detail=f"Lowongan with ID {id_lowongan} not found")
+    
+    last_updated, row = result
+    headers = {
+        "Cache-Control": DETAIL_CACHE_CONTROL,
+        "ETag": detail_etag(id_lowongan, last_updated)
+    }
+    last_modified = http_date(last_updated)
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    
+    if row is None:
+        return Response(status_code=304, headers=headers)
+    
+    # Validate once here and serialize the dump directly; returning the model
+    # would make FastAPI validate it a second time against response_model
+    detail = LowonganDetail.model_validate(dict(row))
+    return ORJSONResponse(detail.model_dump(), headers=headers)
+
+def _query_stats(conn):
+    """Build the stats payload from the lowongan count and latest scrape metadata"""
+    # Get total lowongan count
+    total_query = "SELECT COUNT(*) as total FROM lowongan"
+    total_result = conn.execute(total_query).fetchone()
+    total_lowongan = total_result['total'] if total_result else 0
+    
+    # Get latest scrape metadata
+    metadata_query = """
+        SELECT last_scrape_timestamp, successful_details, failed_details 
+        FROM scrape_metadata 
+        ORDER BY id DESC 
+        LIMIT 1
+    """
+    metadata_result = conn.execute(metadata_query).fetchone()
+    
+    if metadata_result:
+        last_scrape = metadata_result['last_scrape_timestamp']
+        successful_details = metadata_result['successful_details']
+        failed_details = metadata_result['failed_details']
+    else:
+        last_scrape = None
+        successful_details = 0
+        failed_details = 0
+    
+    stats = StatsResponse(
+        total_lowongan=total_lowongan,
+        last_scrape_timestamp=last_scrape,
+        successful_details=successful_details,
+        failed_details=failed_details,
+        database_file_exists=True,
+        api_version="1.0.0"
+    )
+    return stats.model_dump(), last_scrape
 
 @app.get("/api/v1/stats", response_model=StatsResponse)
-async def get_stats():
+async def get_stats(request: Request):
     """
     Get API statistics and metadata
     """
-    database_exists = os.path.exists(DB_FILE)
-    
-    if not database_exists:
+    if not database_file_exists():
         return StatsResponse(
             total_lowongan=0,
             last_scrape_timestamp=None,
@@ -279,152 +724,78 @@ async def get_stats():
             api_version="1.0.0"
         )
     
-    conn = get_db_connection()
-    
     try:
-        # Get total lowongan count
-        total_query = "SELECT COUNT(*) as total FROM lowongan"
-        total_result = conn.execute(total_query).fetchone()
-        total_lowongan = total_result['total'] if total_result else 0
-        
-        # Get latest scrape metadata
-        metadata_query = """
-            SELECT last_scrape_timestamp, successful_details, failed_details 
-            FROM scrape_metadata 
-            ORDER BY id DESC 
-            LIMIT 1
-        """
-        metadata_result = conn.execute(metadata_query).fetchone()
-        
-        if metadata_result:
-            last_scrape = metadata_result['last_scrape_timestamp']
-            successful_details = metadata_result['successful_details']
-            failed_details = metadata_result['failed_details']
-        else:
-            last_scrape = None
-            successful_details = 0
-            failed_details = 0
-        
-        return StatsResponse(
-            total_lowongan=total_lowongan,
-            last_scrape_timestamp=last_scrape,
-            successful_details=successful_details,
-            failed_details=failed_details,
-            database_file_exists=True,
-            api_version="1.0.0"
-        )
-        
+        return await cached_json_response(request, "stats", _query_stats)
     except sqlite3.Error as e:
         logger.error(f"Database query error: {e}")
         raise HTTPException(status_code=500, detail="Database query failed")
-    finally:
-        conn.close()
+
+def _query_categories(conn):
+    """Build the payload of all distinct categories"""
+    query = "SELECT DISTINCT kategori FROM lowongan WHERE kategori IS NOT NULL ORDER BY kategori"
+    cursor = conn.execute(query)
+    categories = [row['kategori'] for row in cursor.fetchall()]
+    
+    payload = {
+        "categories": categories,
+        "count": len(categories)
+    }
+    return payload, _query_last_scrape_timestamp(conn)
 
 @app.get("/api/v1/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get all available categories"""
-    conn = get_db_connection()
-    
     try:
-        query = "SELECT DISTINCT kategori FROM lowongan WHERE kategori IS NOT NULL ORDER BY kategori"
-        cursor = conn.execute(query)
-        results = cursor.fetchall()
-        
-        categories = [row['kategori'] for row in results]
-        
-        return {
-            "categories": categories,
-            "count": len(categories)
-        }
-        
+        return await cached_json_response(request, "categories", _query_categories)
     except sqlite3.Error as e:
         logger.error(f"Database query error: {e}")
         raise HTTPException(status_code=500, detail="Database query failed")
-    finally:
-        conn.close()
+
+def _query_mitras(conn):
+    """Build the payload of all distinct mitras"""
+    query = "SELECT DISTINCT mitra FROM lowongan WHERE mitra IS NOT NULL ORDER BY mitra"
+    cursor = conn.execute(query)
+    mitras = [row['mitra'] for row in cursor.fetchall()]
+    
+    payload = {
+        "mitras": mitras,
+        "count": len(mitras)
+    }
+    return payload, _query_last_scrape_timestamp(conn)
 
 @app.get("/api/v1/mitras")
-async def get_mitras():
+async def get_mitras(request: Request):
     """Get all available mitras"""
-    conn = get_db_connection()
-    
     try:
-        query = "SELECT DISTINCT mitra FROM lowongan WHERE mitra IS NOT NULL ORDER BY mitra"
-        cursor = conn.execute(query)
-        results = cursor.fetchall()
-        
-        mitras = [row['mitra'] for row in results]
-        
-        return {
-            "mitras": mitras,
-            "count": len(mitras)
-        }
-        
+        return await cached_json_response(request, "mitras", _query_mitras)
     except sqlite3.Error as e:
         logger.error(f"Database query error: {e}")
         raise HTTPException(status_code=500, detail="Database query failed")
-    finally:
-        conn.close()
 
 # Background task for scraping
-async def run_scraper():
-    """Run scraper as background task"""
+@functools.lru_cache(maxsize=None)
+def load_scraper(scraper_path: str):
+    """Import the scraper module from its file path (once per process)"""
+    spec = importlib.util.spec_from_file_location("scraper", scraper_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+async def run_scraper(scraper, lock):
+    """Run scraper in-process as background task, releasing its ScrapeLock when done"""
     try:
         logger.info("Starting background scraper task")
+        await asyncio.wait_for(scraper.run(), timeout=SCRAPER_TIMEOUT)
         
-        # Get absolute path to scraper
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        scraper_dir = os.path.join(project_root, 'scraper_new')
-        scraper_path = os.path.join(scraper_dir, 'scraper.py')
-        
-        # Check if scraper exists
-        if not os.path.exists(scraper_path):
-            logger.error(f"Scraper script not found at: {scraper_path}")
-            return
-        
-        # Run scraper in thread to avoid Windows subprocess issues
-        import threading
-        import subprocess
-        import sys
-        
-        def run_scraper_sync():
-            try:
-                python_exe = sys.executable
-                cmd = [python_exe, scraper_path]
-                
-                logger.info(f"Running command: {' '.join(cmd)}")
-                logger.info(f"Working directory: {scraper_dir}")
-                
-                result = subprocess.run(
-                    cmd,
-                    cwd=scraper_dir,
-                    capture_output=True,
-                    text=True,
-                    timeout=1800  # 30 minutes timeout
-                )
-                
-                if result.returncode == 0:
-                    logger.info("Scraper completed successfully")
-                    if result.stdout:
-                        logger.info(f"Scraper output: {result.stdout}")
-                else:
-                    logger.error(f"Scraper failed with return code {result.returncode}")
-                    if result.stderr:
-                        logger.error(f"Scraper error: {result.stderr}")
-                        
-            except subprocess.TimeoutExpired:
-                logger.error("Scraper timed out after 30 minutes")
-            except Exception as e:
-                logger.error(f"Error in scraper thread: {e}", exc_info=True)
-        
-        # Run in background thread
-        thread = threading.Thread(target=run_scraper_sync, daemon=True)
-        thread.start()
-        logger.info("Scraper started in background thread")
+        logger.info("Scraper completed successfully")
+        invalidate_response_cache()
             
+    except asyncio.TimeoutError:
+        logger.error("Scraper timed out after 30 minutes")
     except Exception as e:
         logger.error(f"Error running scraper: {e}", exc_info=True)
+    finally:
+        lock.release()
 
 @app.post("/api/v1/trigger-scrape", response_model=TriggerScrapeResponse)
 async def trigger_scrape(
@@ -434,13 +805,20 @@ async def trigger_scrape(
     """
     Trigger manual scraping process (Protected endpoint)
     
-    Requires X-API-Key header with valid API key.
+    Requires X-API-Key header with valid API key. Returns 409 while another
+    scrape is running, whether triggered on any API worker or started by cron.
     """
     if not os.path.exists(SCRAPER_SCRIPT):
         raise HTTPException(status_code=503, detail="Scraper script not found")
     
-    # Add background task
-    background_tasks.add_task(run_scraper)
+    scraper = load_scraper(SCRAPER_SCRIPT)
+    # File lock shared across processes: API workers do not share app.state
+    lock = scraper.ScrapeLock()
+    if not lock.acquire():
+        raise HTTPException(status_code=409, detail="Scraping is already in progress")
+    
+    # Add background task (releases the lock when finished)
+    background_tasks.add_task(run_scraper, scraper, lock)
     
     return TriggerScrapeResponse(
         message="Scraping process has been triggered. Check /api/v1/stats after a few minutes for updated data.",
@@ -451,7 +829,7 @@ async def trigger_scrape(
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    database_status = "ok" if os.path.exists(DB_FILE) else "database_missing"
+    database_status = "ok" if database_file_exists() else "database_missing"
     
     return {
         "status": "ok",
@@ -479,9 +857,6 @@ async def general_exception_handler(request, exc):
 if __name__ == "__main__":
     import uvicorn
     
-    # Create database directory if it doesn't exist
-    os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
-    
     uvicorn.run(
         "api_server:app",
         host="0.0.0.0",
@@ -0,0 +1,83 @@
+"""
+SQLite connection pool for Magang Berdampak API
+"""
+
+import queue
+import sqlite3
+import threading
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Connection tuning, applied once per connection when it is opened.
+# journal_mode must come first: the remaining pragmas assume WAL.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_spill=OFF",
+)
+
+class ConnectionPool:
+    """Fixed-size pool of long-lived SQLite connections
+
+    Connections are opened lazily on first use so that the pool never creates
+    an empty database file before the scraper has run.
+    """
+
+    def __init__(self, db_file: str, size: int):
+        self.db_file = db_file
+        self.size = size
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        return conn
+
+    def open(self) -> None:
+        """Open all connections of the pool (no-op if already open)"""
+        with self._lock:
+            if self._opened:
+                return
+            connections = []
+            try:
+                for _ in range(self.size):
+                    connections.append(self._connect())
+            except sqlite3.Error:
+                for conn in connections:
+                    conn.close()
+                raise
+            for conn in connections:
+                self._idle.put(conn)
+            self._opened = True
+        logger.info(f"Opened {self.size} SQLite connection(s) to {self.db_file}")
+
+    def get(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """Take a connection from the pool, opening the pool if needed"""
+        if not self._opened:
+            self.open()
+        return self._idle.get(timeout=timeout)
+
+    def put(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool"""
+        self._idle.put(conn)
+
+    def close(self) -> None:
+        """Close every idle connection and mark the pool as closed"""
+        with self._lock:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+            self._opened = False
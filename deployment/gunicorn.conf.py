@@ -11,17 +11,17 @@ backlog = 2048
 workers = multiprocessing.cpu_count() * 2 + 1
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
-max_requests = 1000
-max_requests_jitter = 50
 preload_app = True
 
 # Timeout
 timeout = 30
 keepalive = 2
 
-# Restart workers after this many requests, to help prevent memory leaks
-max_requests = 1000
-max_requests_jitter = 100
+# No request-count recycling: /api/v1/trigger-scrape runs the scraper inside
+# the worker that received it, and a recycled worker would kill that scrape
+# (the scrape lock in database/scrape.lock is released, and fetched details are
+# kept in the cache, but the database is not updated until the next run)
+max_requests = 0
 
 # Logging
 accesslog = "/var/log/magang-api/access.log"
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Production runner for Magang Berdampak API
+"""
+
+import os
+import sys
+
+import uvicorn
+
+# Project root, so the runner works from any working directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(BASE_DIR, "api_new")
+
+HOST = os.getenv("API_HOST", "0.0.0.0")
+PORT = int(os.getenv("API_PORT", "8000"))
+WORKERS = int(os.getenv("API_WORKERS", os.cpu_count() or 1))
+
+def main():
+    """Start uvicorn with one worker per CPU"""
+    os.makedirs(os.path.join(BASE_DIR, "database"), exist_ok=True)
+
+    print(f"🚀 Starting Magang Berdampak API on http://{HOST}:{PORT} with {WORKERS} worker(s)")
+
+    # Every worker opens its own SQLite pool on the same absolute DB path;
+    # WAL mode lets them all read while the scraper writes.
+    uvicorn.run(
+        "api_server:app",
+        app_dir=API_DIR,
+        host=HOST,
+        port=PORT,
+        workers=WORKERS,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",  # uvloop is not available on Windows
+        http="httptools",
+        access_log=False,
+        log_level="info"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,201 @@
 import asyncio
+import functools
+import hashlib
+import html
 import httpx
-import json
+import ijson
+import orjson
 import sqlite3
+import zstandard
 import time
 import os
 import random
+import re
 from datetime import datetime
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple, Iterable, Iterator
 import logging
 
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
 # --- Konfigurasi ---
 BASE_URL = "https://simbelmawa.kemdikbud.go.id/magang/lowongan"
+URL_PREFIX = BASE_URL + '/'  # detail URL = URL_PREFIX + slug
+
+# Inertia renders the initial page object as an HTML-escaped JSON attribute:
+# <div id="app" data-page="{...}">. Escaping guarantees no '"' or '>' inside it.
+APP_DIV_RE = re.compile(rb'<div\b[^>]*\bid="app"[^>]*>')
+DATA_PAGE_RE = re.compile(rb'\bdata-page="([^"]*)"')
 
 # Get paths relative to project root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CACHE_FILE = os.path.join(BASE_DIR, 'database', 'detail_cache.json')
-DB_FILE = os.path.join(BASE_DIR, 'database', 'magang_data.db')
+DB_DIR = os.path.join(BASE_DIR, 'database')
+CACHE_FILE = os.path.join(DB_DIR, 'detail_cache.json')  # legacy, migrated into DB_FILE
+DB_FILE = os.path.join(DB_DIR, 'magang_data.db')
+SCRAPE_LOCK_FILE = os.path.join(DB_DIR, 'scrape.lock')
+
+# Cache payloads are zstd-compressed JSON; rows written before compression was
+# added are plain JSON and are told apart by the zstd frame magic number
+ZSTD_LEVEL = 3
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
 
 # Pengaturan scraping
 MAX_CONCURRENT_REQUESTS = 25 
+MIN_CONCURRENT_REQUESTS = 5  # lower bound when the server throttles (HTTP 429)
+RECOVERY_AFTER = 20  # successful requests before the limit grows by one again
+DETAIL_BATCH_SIZE = 200  # fetched details checkpointed to the cache at a time
+DETAIL_WORKERS = MAX_CONCURRENT_REQUESTS  # detail consumers; the AdmissionController caps actual requests
+DETAIL_QUEUE_SIZE = 500  # summaries buffered between list pages and detail workers
 RETRY_COUNT = 3
 RETRY_DELAY = 2
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
-)
+# Pengaturan koneksi: semua request ke host yang sama, jadi koneksi keep-alive
+# (dan multiplexing HTTP/2) dipakai ulang alih-alih handshake TCP+TLS baru
+HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=60)
+
 logger = logging.getLogger(__name__)
 
+def setup_logging() -> None:
+    """Log to scraper.log and stderr when running as a standalone script"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('scraper.log'),
+            logging.StreamHandler()
+        ]
+    )
+
 # --- Fungsi Helper Cache ---
-def load_cache() -> Dict:
-    """Load cache from JSON file"""
-    if os.path.exists(CACHE_FILE):
+# Detail responses are cached per slug in the detail_cache table of DB_FILE,
+# so a run only writes the entries it fetched instead of rewriting a whole file.
+def iter_json_cache() -> Iterator[Tuple[str, Dict]]:
+    """Stream (slug, entry) pairs from the legacy JSON cache file without loading it whole"""
+    if not os.path.exists(CACHE_FILE):
+        return
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            logger.info(f"Cache lama ditemukan. Memuat {CACHE_FILE}...")
+            # use_float keeps numbers as int/float instead of Decimal, like json.load
+            yield from ijson.kvitems(f, '', use_float=True)
+    except ijson.JSONError:
+        logger.warning("Cache rusak. Entri setelah bagian yang rusak diabaikan.")
+
+def iter_cache() -> Iterator[Tuple[str, Optional[Dict]]]:
+    """Stream (slug, entry) pairs from the detail_cache table
+    
+    A payload that cannot be decoded yields None for that slug only, so one
+    corrupt row never costs the rest of the cache.
+    """
+    decompressor = zstandard.ZstdDecompressor()  # contexts are not thread-safe, so one per call
+    conn = connect_db()
+    try:
+        for slug, payload in conn.execute('SELECT slug, payload FROM detail_cache'):
+            try:
+                if payload[:4] == ZSTD_MAGIC:
+                    payload = decompressor.decompress(payload)
+                entry = orjson.loads(payload)
+            except (zstandard.ZstdError, orjson.JSONDecodeError):
+                logger.warning(f"Cache entry {slug} rusak. Entri ini akan di-scrape ulang.")
+                entry = None
+            yield slug, entry
+    finally:
+        conn.close()
+
+def load_cached_slugs() -> Set[str]:
+    """Return the slugs in the cache without decoding their payloads"""
+    conn = connect_db()
+    try:
+        return {slug for (slug,) in conn.execute('SELECT slug FROM detail_cache')}
+    finally:
+        conn.close()
+
+def load_cache(slugs: Set[str]) -> Tuple[Dict, List[str]]:
+    """Load the cache entries of the given slugs
+    
+    Entries for other slugs are never kept in memory. Returns the entries and
+    the slugs of the outdated (or corrupt) entries that were skipped.
+    """
+    cache = {}
+    outdated_slugs = []
+    for slug, entry in iter_cache():
+        if entry is not None and slug in slugs:
+            cache[slug] = entry
+        else:
+            outdated_slugs.append(slug)
+    return cache, outdated_slugs
+
+def upsert_cache(entries: Iterable[Tuple[str, Dict]]) -> int:
+    """Insert or update (slug, entry) pairs in the cache, returning the number written"""
+    updated_at = datetime.now().isoformat()
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)  # contexts are not thread-safe, so one per call
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
         try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                logger.info(f"Cache ditemukan. Memuat {CACHE_FILE}...")
-                return json.load(f)
-        except json.JSONDecodeError:
-            logger.warning("Cache rusak. Memulai dari awal.")
-            return {}
-    return {}
-
-def save_to_cache(cache: Dict) -> None:
-    """Save cache to JSON file"""
-    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+            cursor.executemany(
+                'INSERT OR REPLACE INTO detail_cache (slug, payload, updated_at) VALUES (?, ?, ?)',
+                ((slug, compressor.compress(orjson.dumps(entry)), updated_at) for slug, entry in entries)
+            )
+            written_count = cursor.rowcount  # read before COMMIT, which resets it
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        return written_count
+    finally:
+        conn.close()
+
+def delete_from_cache(slugs: List[str]) -> None:
+    """Remove the given slugs from the cache"""
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.executemany('DELETE FROM detail_cache WHERE slug = ?', ((slug,) for slug in slugs))
+        cursor.execute('COMMIT')
+    finally:
+        conn.close()
+
+def migrate_json_cache() -> None:
+    """Move the legacy detail_cache.json into the detail_cache table (once)"""
+    if not os.path.exists(CACHE_FILE):
+        return
+    migrated_count = upsert_cache(iter_json_cache())
+    os.replace(CACHE_FILE, CACHE_FILE + '.migrated')
+    logger.info(f"Migrated {migrated_count} cache entries from {CACHE_FILE} to the database")
 
 # --- Fungsi Database ---
+# Write tuning: WAL lets the API keep reading while the scraper writes, and
+# synchronous=NORMAL only fsyncs at checkpoints instead of on every commit.
+# journal_mode is persistent; the others are per connection.
+DB_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+def connect_db() -> sqlite3.Connection:
+    """Open the database in WAL mode with the write PRAGMAs applied"""
+    # Autocommit mode: callers delimit their transactions with explicit BEGIN/COMMIT
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    if journal_mode.lower() != 'wal':
+        logger.warning(f"Could not enable WAL journal mode (got {journal_mode})")
+    for pragma in DB_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 def init_db() -> None:
     """Initialize SQLite database with optimized schema"""
-    os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
-    conn = sqlite3.connect(DB_FILE)
+    os.makedirs(DB_DIR, exist_ok=True)  # the only mkdir of a run; cache writes go to the same DB
+    conn = connect_db()
     cursor = conn.cursor()
+    cursor.execute('BEGIN')
     
     # Create main table with proper indexing
     cursor.execute('''
@@ -75,10 +213,16 @@ def init_db() -> None:
             kualifikasi TEXT,
             kompetensi_dikembangkan TEXT,
             last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            content_hash TEXT
         )
     ''')
     
+    # Migrate databases created before content_hash existed
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(lowongan)')}
+    if 'content_hash' not in columns:
+        cursor.execute('ALTER TABLE lowongan ADD COLUMN content_hash TEXT')
+    
     # Create metadata table for tracking scrape info
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS scrape_metadata (
@@ -90,6 +234,15 @@ def init_db() -> None:
         )
     ''')
     
+    # Create detail cache table (orjson-encoded detail responses per slug)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS detail_cache (
+            slug TEXT PRIMARY KEY,
+            payload BLOB NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    ''')
+    
     # Create indexes for better performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_posisi ON lowongan(posisi)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_mitra ON lowongan(mitra)')
@@ -97,119 +250,258 @@ def init_db() -> None:
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_lokasi ON lowongan(lokasi_penempatan)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_last_updated ON lowongan(last_updated)')
     
-    conn.commit()
+    cursor.execute('COMMIT')
     conn.close()
     logger.info("Database initialized successfully")
 
+# Kriteria kategori values repeat across almost every row, so format each once.
+# (Newlines are flattened with str.replace: for a single character it is far
+# faster than str.translate.)
+@functools.lru_cache(maxsize=None)
+def kategori_label(kategori: str) -> str:
+    """Format a kriteria kategori such as 'hard_skill' as 'Hard Skill'"""
+    return kategori.replace('_', ' ').title()
+
+def content_hash(item: Dict) -> str:
+    """Hash of a cached item, used to skip rows whose source data did not change"""
+    return hashlib.blake2b(orjson.dumps(item, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+def _row_for(item: Dict, item_hash: str, last_updated: str) -> tuple:
+    """Build the lowongan row of one cached item (summary plus detail, if any)"""
+    detail_lowongan = item.get('detail', {}).get('lowongan', {})
+    
+    # Process even if detail is missing (save summary data)
+    if detail_lowongan:
+        # Full data with details
+        kriteria_list = detail_lowongan.get('lowongan_kriteria', [])
+        kualifikasi_str = " | ".join([
+            f"[{kategori_label(k.get('kategori', ''))}] {deskripsi.replace(chr(10), ' ')}" 
+            for k in kriteria_list if (deskripsi := k.get('deskripsi'))
+        ])
+        
+        tugas_list = detail_lowongan.get('lowongan_tanggung_jawab', [])
+        tugas_str = " | ".join([
+            deskripsi.replace(chr(10), ' ') 
+            for t in tugas_list if (deskripsi := t.get('deskripsi'))
+        ])
+        
+        capaian_list = detail_lowongan.get('lowongan_capaian', [])
+        kompetensi_str = " | ".join([
+            deskripsi.replace(chr(10), ' ') 
+            for c in capaian_list if (deskripsi := c.get('deskripsi'))
+        ])
+        
+        deskripsi_detail = str(detail_lowongan.get('deskripsi', '')).replace('\n', ' ')
+    else:
+        # Summary data only
+        kualifikasi_str = ""
+        tugas_str = ""
+        kompetensi_str = ""
+        deskripsi_detail = ""
+    
+    # Common data processing
+    slug = item.get('slug')
+    return (
+        item.get('id_lowongan'),
+        item.get('posisi_magang', ''),
+        item.get('mitra', ''),
+        item.get('kategori_posisi', ''),
+        item.get('jumlah', 0),
+        str(item.get('lokasi_penempatan', '')).replace('\n', ' | '),
+        str(item.get('deskripsi', '')).replace('\n', ' '),
+        URL_PREFIX + slug if slug else '',
+        deskripsi_detail,
+        tugas_str,
+        kualifikasi_str,
+        kompetensi_str,
+        last_updated,
+        item_hash
+    )
+
 def save_to_db(all_full_data: List[Dict], valid_ids: Set[int]) -> None:
     """Save data to database and cleanup old entries"""
     if not all_full_data:
         logger.warning("No data to save to database")
         return
         
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    success_count = len(all_full_data)
+    skipped_count = sum(1 for item in all_full_data if not item.get('detail', {}).get('lowongan'))
+    scrape_timestamp = datetime.now().isoformat()  # shared by every row written in this save
     
-    rows_to_insert = []
-    skipped_count = 0
-    success_count = 0
+    conn = connect_db()
+    cursor = conn.cursor()
     
-    for item in all_full_data:
-        detail_lowongan = item.get('detail', {}).get('lowongan', {})
+    # One write transaction for the upsert, cleanup and metadata: a single
+    # commit, and API readers never see a half-updated table
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        # Insert/Update data. An upsert updates existing rows in place, so
+        # created_at survives and the API's lowongan_fts_au trigger keeps the
+        # search index in sync; rows with an unchanged content_hash are left alone
+        sql_query = '''
+            INSERT INTO lowongan (
+                id_lowongan, posisi, mitra, kategori, jumlah_dibutuhkan, 
+                lokasi_penempatan, deskripsi_singkat, url_detail, 
+                deskripsi_detail, tugas_tanggung_jawab, kualifikasi, 
+                kompetensi_dikembangkan, last_updated, content_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id_lowongan) DO UPDATE SET
+                posisi = excluded.posisi,
+                mitra = excluded.mitra,
+                kategori = excluded.kategori,
+                jumlah_dibutuhkan = excluded.jumlah_dibutuhkan,
+                lokasi_penempatan = excluded.lokasi_penempatan,
+                deskripsi_singkat = excluded.deskripsi_singkat,
+                url_detail = excluded.url_detail,
+                deskripsi_detail = excluded.deskripsi_detail,
+                tugas_tanggung_jawab = excluded.tugas_tanggung_jawab,
+                kualifikasi = excluded.kualifikasi,
+                kompetensi_dikembangkan = excluded.kompetensi_dikembangkan,
+                last_updated = excluded.last_updated,
+                content_hash = excluded.content_hash
+            WHERE lowongan.content_hash IS NOT excluded.content_hash
+        '''
         
-        # Process even if detail is missing (save summary data)
-        if detail_lowongan:
-            # Full data with details
-            kriteria_list = detail_lowongan.get('lowongan_kriteria', [])
-            kualifikasi_str = " | ".join([
-                f"[{k.get('kategori', '').replace('_', ' ').title()}] {k.get('deskripsi', '').replace(chr(10), ' ')}" 
-                for k in kriteria_list if k.get('deskripsi')
-            ])
-            
-            tugas_list = detail_lowongan.get('lowongan_tanggung_jawab', [])
-            tugas_str = " | ".join([
-                t.get('deskripsi', '').replace(chr(10), ' ') 
-                for t in tugas_list if t.get('deskripsi')
-            ])
-            
-            capaian_list = detail_lowongan.get('lowongan_capaian', [])
-            kompetensi_str = " | ".join([
-                c.get('deskripsi', '').replace(chr(10), ' ') 
-                for c in capaian_list if c.get('deskripsi')
-            ])
-            
-            deskripsi_detail = str(detail_lowongan.get('deskripsi', '')).replace('\n', ' ')
-        else:
-            # Summary data only
-            skipped_count += 1
-            kualifikasi_str = ""
-            tugas_str = ""
-            kompetensi_str = ""
-            deskripsi_detail = ""
+        # Only write new or changed items; unchanged rows keep their last_updated
+        stored_hashes = dict(cursor.execute('SELECT id_lowongan, content_hash FROM lowongan'))
+        changed_items = [
+            (item, item_hash) for item in all_full_data
+            if stored_hashes.get(item.get('id_lowongan')) != (item_hash := content_hash(item))
+        ]
+        del stored_hashes
         
-        # Common data processing
-        row_tuple = (
-            item.get('id_lowongan'),
-            item.get('posisi_magang', ''),
-            item.get('mitra', ''),
-            item.get('kategori_posisi', ''),
-            item.get('jumlah', 0),
-            str(item.get('lokasi_penempatan', '')).replace('\n', ' | '),
-            str(item.get('deskripsi', '')).replace('\n', ' '),
-            f"{BASE_URL}/{item.get('slug', '')}" if item.get('slug') else '',
-            deskripsi_detail,
-            tugas_str,
-            kualifikasi_str,
-            kompetensi_str,
-            datetime.now().isoformat()
-        )
-        rows_to_insert.append(row_tuple)
-        success_count += 1
-    
-    # Insert/Update data
-    sql_query = '''
-        INSERT OR REPLACE INTO lowongan (
-            id_lowongan, posisi, mitra, kategori, jumlah_dibutuhkan, 
-            lokasi_penempatan, deskripsi_singkat, url_detail, 
-            deskripsi_detail, tugas_tanggung_jawab, kualifikasi, 
-            kompetensi_dikembangkan, last_updated
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    '''
-    
-    cursor.executemany(sql_query, rows_to_insert)
-    
-    # Cleanup: Delete entries that are no longer on the website
-    if valid_ids:
-        placeholders = ','.join('?' for _ in valid_ids)
-        delete_query = f'DELETE FROM lowongan WHERE id_lowongan NOT IN ({placeholders})'
-        cursor.execute(delete_query, list(valid_ids))
-        deleted_count = cursor.rowcount
+        # Rows are built lazily, one at a time, as executemany consumes them
+        cursor.executemany(sql_query, (_row_for(item, item_hash, scrape_timestamp) for item, item_hash in changed_items))
+        
+        # Cleanup: Delete entries that are no longer on the website. The ids go
+        # through a temp table rather than one bound parameter each, which
+        # would hit SQLITE_MAX_VARIABLE_NUMBER on large scrapes
+        if valid_ids:
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS _valid (id INTEGER PRIMARY KEY)')
+            cursor.execute('DELETE FROM _valid')
+            cursor.executemany('INSERT INTO _valid (id) VALUES (?)', ((id_lowongan,) for id_lowongan in valid_ids))
+            cursor.execute('DELETE FROM lowongan WHERE id_lowongan NOT IN (SELECT id FROM _valid)')
+            deleted_count = cursor.rowcount
+        
+            if deleted_count > 0:
+                logger.info(f"Deleted {deleted_count} outdated entries from database")
         
-        if deleted_count > 0:
-            logger.info(f"Deleted {deleted_count} outdated entries from database")
+        # Update metadata
+        cursor.execute('DELETE FROM scrape_metadata')  # Keep only latest
+        cursor.execute('''
+            INSERT INTO scrape_metadata (last_scrape_timestamp, total_lowongan, successful_details, failed_details)
+            VALUES (?, ?, ?, ?)
+        ''', (scrape_timestamp, success_count, success_count - skipped_count, skipped_count))
+        
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
     
-    # Update metadata
-    cursor.execute('DELETE FROM scrape_metadata')  # Keep only latest
-    cursor.execute('''
-        INSERT INTO scrape_metadata (last_scrape_timestamp, total_lowongan, successful_details, failed_details)
-        VALUES (?, ?, ?, ?)
-    ''', (datetime.now().isoformat(), len(rows_to_insert), success_count - skipped_count, skipped_count))
+    logger.info(f"Database updated: {success_count} total, {success_count - skipped_count} with details, {skipped_count} summary only, {len(changed_items)} new or changed rows written")
+
+# --- Lock Scraping ---
+class ScrapeLock:
+    """Non-blocking lock that keeps scrapes from overlapping across processes
     
-    conn.commit()
-    conn.close()
+    Held as an OS file lock on SCRAPE_LOCK_FILE, so it is shared by the cron
+    scraper and every API worker, and released by the OS if its holder dies.
+    """
+    
+    def __init__(self, path: str = SCRAPE_LOCK_FILE):
+        self.path = path
+        self._fd: Optional[int] = None
     
-    logger.info(f"Database updated: {success_count} total, {success_count - skipped_count} with details, {skipped_count} summary only")
+    def acquire(self) -> bool:
+        """Take the lock, returning False if another scrape holds it"""
+        if self._fd is not None:
+            return False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.name == 'nt':
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+    
+    def release(self) -> None:
+        """Release the lock (closing the file drops it)"""
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            os.close(fd)
 
 # --- Fungsi Fetch Inti ---
-async def fetch_with_retry(client: httpx.AsyncClient, url: str, headers: Dict) -> Optional[httpx.Response]:
-    """Fetch URL with retry mechanism"""
+class AdmissionController:
+    """Concurrency limit that can change while requests are in flight
+    
+    Used like a semaphore (``async with controller:``). On HTTP 429 the limit
+    is halved down to min_limit; after every recovery_after successful
+    requests it grows by one again, up to max_limit.
+    """
+    
+    def __init__(self, max_limit: int, min_limit: int = MIN_CONCURRENT_REQUESTS, recovery_after: int = RECOVERY_AFTER):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.recovery_after = recovery_after
+        self.limit = max_limit
+        self._active = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+    
+    async def __aenter__(self) -> "AdmissionController":
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+    
+    async def set_limit(self, limit: int) -> None:
+        """Change the number of requests allowed in flight"""
+        async with self._cond:
+            self.limit = max(self.min_limit, min(limit, self.max_limit))
+            self._successes = 0
+            self._cond.notify_all()
+    
+    async def throttled(self) -> None:
+        """Back off after the server answered 429 Too Many Requests"""
+        if self.limit > self.min_limit:
+            await self.set_limit(self.limit // 2)
+            logger.warning(f"Throttled by server, concurrency lowered to {self.limit}")
+    
+    async def succeeded(self) -> None:
+        """Slowly recover the limit after successful requests"""
+        if self.limit >= self.max_limit:
+            return
+        self._successes += 1
+        if self._successes >= self.recovery_after:
+            await self.set_limit(self.limit + 1)
+
+async def fetch_with_retry(client: httpx.AsyncClient, url: str, headers: Dict, controller: AdmissionController) -> Optional[bytes]:
+    """Fetch URL with retry mechanism, returning the raw response body"""
     for attempt in range(RETRY_COUNT):
         try:
-            response = await client.get(url, headers=headers, timeout=45.0)
-            response.raise_for_status()
-            return response
+            # Streaming checks the status before the body is read, so error
+            # pages are never downloaded, and only the raw bytes are kept
+            async with client.stream('GET', url, headers=headers, timeout=45.0) as response:
+                response.raise_for_status()
+                body = await response.aread()
+            await controller.succeeded()
+            return body
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             logger.warning(f"Attempt {attempt + 1}/{RETRY_COUNT} failed for {url}. Error: {type(e).__name__}")
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429:
+                await controller.throttled()
             if attempt + 1 == RETRY_COUNT:
                 return None
             await asyncio.sleep(RETRY_DELAY + random.uniform(0, 1))
@@ -221,14 +513,15 @@ async def get_initial_data_and_version(client: httpx.AsyncClient) -> tuple[Optio
         response = await client.get(BASE_URL)
         response.raise_for_status()
         
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        app_div = soup.find('div', id='app')
-        
+        app_div = APP_DIV_RE.search(response.content)
         if not app_div:
             raise Exception("Could not find app div")
+        
+        data_page = DATA_PAGE_RE.search(app_div.group(0))
+        if not data_page:
+            raise Exception("Could not find data-page attribute")
             
-        page_data = json.loads(app_div.get('data-page'))
+        page_data = orjson.loads(html.unescape(data_page.group(1).decode()))
         version = page_data.get('version')
         pagination_info = page_data['props']['data']
         total_pages = pagination_info['last_page']
@@ -241,138 +534,203 @@ async def get_initial_data_and_version(client: httpx.AsyncClient) -> tuple[Optio
         logger.error(f"Failed to get initial data: {e}")
         return None, None, []
 
-async def fetch_list_page(client: httpx.AsyncClient, page_num: int, semaphore: asyncio.Semaphore, inertia_version: str) -> List[Dict]:
+async def fetch_list_page(client: httpx.AsyncClient, page_num: int, controller: AdmissionController, inertia_version: str) -> List[Dict]:
     """Fetch lowongan list from specific page"""
-    async with semaphore:
+    async with controller:
         url_halaman = f"{BASE_URL}?page={page_num}"
         headers = {'X-Inertia': 'true', 'X-Inertia-Version': inertia_version}
-        response = await fetch_with_retry(client, url_halaman, headers)
-        if response:
-            return response.json()['props']['data']['data']
+        body = await fetch_with_retry(client, url_halaman, headers, controller)
+        if body is not None:
+            return orjson.loads(body)['props']['data']['data']
         return []
 
-async def fetch_detail_page(client: httpx.AsyncClient, lowongan_summary: Dict, semaphore: asyncio.Semaphore, inertia_version: str) -> Optional[Dict]:
+async def fetch_detail_page(client: httpx.AsyncClient, lowongan_summary: Dict, controller: AdmissionController, inertia_version: str) -> Optional[Dict]:
     """Fetch detail page for a specific lowongan"""
-    async with semaphore:
+    async with controller:
         slug = lowongan_summary.get('slug')
         if not slug:
             return None
             
         detail_url = f"{BASE_URL}/{slug}"
         headers = {'X-Inertia': 'true', 'X-Inertia-Version': inertia_version}
-        response = await fetch_with_retry(client, detail_url, headers)
+        body = await fetch_with_retry(client, detail_url, headers, controller)
         
-        if response:
-            detail_data_json = response.json()
-            full_data = {**lowongan_summary, "detail": detail_data_json.get('props', {})}
+        if body is not None:
+            # Keep only the props; the raw body and the rest of the page object are dropped here
+            detail_props = orjson.loads(body).get('props', {})
+            del body
+            full_data = {**lowongan_summary, "detail": detail_props}
             logger.info(f"Successfully fetched detail: {slug}")
             return full_data
             
         logger.warning(f"Failed to fetch detail: {slug}")
         return None
 
-async def main() -> None:
-    """Main scraping function"""
+async def fetch_summaries_and_details(
+    client: httpx.AsyncClient,
+    controller: AdmissionController,
+    inertia_version: str,
+    total_pages: int,
+    first_page_data: List[Dict],
+    cached_slugs: Set[str]
+) -> Tuple[List[Dict], int, int]:
+    """Fetch list pages and the details of uncached lowongan as one pipeline
+    
+    As each list page arrives its summaries are queued for DETAIL_WORKERS
+    consumers, so detail fetches run while later list pages are still loading.
+    Fetched details are checkpointed to the cache every DETAIL_BATCH_SIZE
+    entries. Returns all summaries (before dedup) and the numbers of successful
+    and failed detail fetches.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=DETAIL_QUEUE_SIZE)
+    all_summaries: List[Dict] = []
+    queued_slugs: Set[str] = set()
+    new_entries: Dict[str, Dict] = {}
+    counts = {'success': 0, 'failed': 0}
+    
+    async def enqueue(page_data: List[Dict]) -> None:
+        all_summaries.extend(page_data)
+        for summary in page_data:
+            slug = summary.get('slug')
+            if slug and slug not in cached_slugs and slug not in queued_slugs:
+                queued_slugs.add(slug)
+                await queue.put(summary)
+    
+    async def produce() -> None:
+        await enqueue(first_page_data)
+        list_tasks = [
+            asyncio.create_task(fetch_list_page(client, page, controller, inertia_version))
+            for page in range(2, total_pages + 1)
+        ]
+        try:
+            for next_page in asyncio.as_completed(list_tasks):
+                await enqueue(await next_page)
+        finally:
+            # Pages still in flight when a page fails must not outlive the client
+            for task in list_tasks:
+                task.cancel()
+            await asyncio.gather(*list_tasks, return_exceptions=True)
+        
+        # One end-of-input sentinel per consumer
+        for _ in range(DETAIL_WORKERS):
+            await queue.put(None)
+    
+    async def checkpoint() -> None:
+        nonlocal new_entries
+        if not new_entries:
+            return
+        batch, new_entries = new_entries, {}
+        await asyncio.to_thread(upsert_cache, batch.items())
+        logger.info(f"Checkpoint: {len(batch)} details saved to cache ({counts['success'] + counts['failed']} processed)")
+    
+    async def consume() -> None:
+        while (summary := await queue.get()) is not None:
+            try:
+                res = await fetch_detail_page(client, summary, controller, inertia_version)
+            except Exception as e:
+                logger.warning(f"Failed to process detail {summary['slug']}: {e}")
+                res = None
+            
+            if res and res.get('slug'):
+                new_entries[res['slug']] = res
+                counts['success'] += 1
+            else:
+                # Save summary even if detail failed
+                new_entries[summary['slug']] = {**summary, "detail": {}}
+                counts['failed'] += 1
+            
+            if len(new_entries) >= DETAIL_BATCH_SIZE:
+                await checkpoint()
+    
+    tasks = [asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(consume()) for _ in range(DETAIL_WORKERS)]
+    completed = False
+    try:
+        await asyncio.gather(*tasks)
+        completed = True
+    finally:
+        if not completed:
+            # A failed list page (or a cancelled run) stops the whole pipeline
+            # before the caller closes the client. Only fetched details are
+            # kept: summary-only entries would count as cached next run and
+            # leave Stage 2.5 to recover them 50 at a time.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            new_entries = {slug: entry for slug, entry in new_entries.items() if entry.get('detail')}
+        await checkpoint()
+    
+    return all_summaries, counts['success'], counts['failed']
+
+async def run() -> None:
+    """Main scraping function
+    
+    Blocking cache and database work runs in worker threads so the scraper can
+    share an event loop with the API server.
+    """
     start_time = time.time()
     logger.info("=== Starting Magang Berdampak Scraper ===")
     
     try:
         # Initialize database
-        init_db()
-        
-        # Load cache
-        cache = load_cache()
+        await asyncio.to_thread(init_db)
+        await asyncio.to_thread(migrate_json_cache)
         
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        controller = AdmissionController(MAX_CONCURRENT_REQUESTS)
         async with httpx.AsyncClient(
             timeout=30.0, 
+            limits=HTTP_LIMITS,
+            http2=True,
             follow_redirects=True, 
             headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
         ) as client:
             
-            # Stage 1: Get all lowongan summaries
-            logger.info("--- STAGE 1: Fetching all lowongan summaries ---")
+            # Stage 1 + 2: list pages feed the detail workers as they arrive
+            logger.info("--- STAGE 1+2: Fetching lowongan summaries and new details ---")
             version, total_pages, first_page_data = await get_initial_data_and_version(client)
             if not version:
                 logger.error("Failed to get initial data. Exiting.")
                 return
 
-            all_lowongan_summary = first_page_data
-            
-            # Fetch remaining pages
-            if total_pages > 1:
-                list_tasks = [
-                    fetch_list_page(client, page, semaphore, version) 
-                    for page in range(2, total_pages + 1)
-                ]
-                list_results = await asyncio.gather(*list_tasks)
-                for page_data in list_results:
-                    all_lowongan_summary.extend(page_data)
+            cached_slugs = await asyncio.to_thread(load_cached_slugs)
+            logger.info(f"Found {len(cached_slugs)} items in cache")
             
+            all_lowongan_summary, success_count, failed_count = await fetch_summaries_and_details(
+                client, controller, version, total_pages, first_page_data, cached_slugs
+            )
             logger.info(f"Total {len(all_lowongan_summary)} lowongan summaries fetched")
             
-            # Deduplication based on id_lowongan
-            seen_ids = set()
-            unique_lowongan = []
-            duplicate_count = 0
+            if success_count or failed_count:
+                logger.info(f"New details: {success_count} successful, {failed_count} failed")
+            else:
+                logger.info("--- STAGE 2: No new details needed ---")
             
-            for item in all_lowongan_summary:
-                item_id = item.get('id_lowongan')
-                if item_id not in seen_ids:
-                    seen_ids.add(item_id)
-                    unique_lowongan.append(item)
-                else:
-                    duplicate_count += 1
+            # Deduplication based on id_lowongan (first position, latest copy wins)
+            unique_lowongan = {item['id_lowongan']: item for item in all_lowongan_summary if item.get('id_lowongan')}
+            duplicate_count = len(all_lowongan_summary) - len(unique_lowongan)
             
             if duplicate_count > 0:
                 logger.info(f"Removed {duplicate_count} duplicates")
             
-            all_lowongan_summary = unique_lowongan
-            valid_ids = {item.get('id_lowongan') for item in all_lowongan_summary if item.get('id_lowongan')}
+            all_lowongan_summary = list(unique_lowongan.values())
+            valid_ids = set(unique_lowongan)
             logger.info(f"After dedup: {len(all_lowongan_summary)} unique lowongan")
 
-            # Cache management
-            cached_slugs = set(cache.keys())
+            # Cache management: load only entries still listed on the website
+            # (including the ones just fetched), so outdated entries are dropped
+            # while streaming the cache table
             all_slugs_from_summary = {low.get('slug') for low in all_lowongan_summary if low.get('slug')}
-            needed_lowongan = [low for low in all_lowongan_summary if low.get('slug') not in cached_slugs]
+            cache, outdated_slugs = await asyncio.to_thread(load_cache, all_slugs_from_summary)
             
-            logger.info(f"Found {len(cache)} items in cache")
-            logger.info(f"Need to fetch: {len(needed_lowongan)} new details")
+            if outdated_slugs:
+                logger.info(f"Cleaning {len(outdated_slugs)} outdated cache entries")
+                await asyncio.to_thread(delete_from_cache, outdated_slugs)
             
-            # Clean old cache entries
-            cached_but_not_in_summary = cached_slugs - all_slugs_from_summary
-            if cached_but_not_in_summary:
-                logger.info(f"Cleaning {len(cached_but_not_in_summary)} outdated cache entries")
-                for old_slug in cached_but_not_in_summary:
-                    del cache[old_slug]
-
-            # Stage 2: Fetch new details
-            if needed_lowongan:
-                logger.info(f"--- STAGE 2: Fetching {len(needed_lowongan)} new details ---")
-                detail_tasks = [
-                    fetch_detail_page(client, summary, semaphore, version) 
-                    for summary in needed_lowongan
-                ]
-                new_details_results = await asyncio.gather(*detail_tasks)
-                
-                success_count = 0
-                failed_count = 0
-                
-                for i, res in enumerate(new_details_results):
-                    original_summary = needed_lowongan[i]
-                    if res and res.get('slug'):
-                        cache[res.get('slug')] = res
-                        success_count += 1
-                    else:
-                        # Save summary even if detail failed
-                        if original_summary.get('slug'):
-                            cache[original_summary.get('slug')] = {**original_summary, "detail": {}}
-                        failed_count += 1
-                
-                save_to_cache(cache)
-                logger.info(f"New details: {success_count} successful, {failed_count} failed")
-            else:
-                logger.info("--- STAGE 2: No new details needed ---")
+            # Live lowongan whose cache entry was corrupt keep their summary and
+            # get their detail fetched again in Stage 2.5
+            for low in all_lowongan_summary:
+                if low.get('slug') and low['slug'] not in cache:
+                    cache[low['slug']] = {**low, "detail": {}}
                 
             # Stage 2.5: Retry failed details
             items_without_detail = [
@@ -383,25 +741,26 @@ async def main() -> None:
             if items_without_detail:
                 logger.info(f"--- STAGE 2.5: Retrying {len(items_without_detail)} failed details ---")
                 retry_tasks = [
-                    fetch_detail_page(client, item, semaphore, version) 
+                    fetch_detail_page(client, item, controller, version) 
                     for item in items_without_detail[:50]  # Limit retries
                 ]
                 retry_results = await asyncio.gather(*retry_tasks)
                 
-                retry_success = 0
+                retried_entries = {}
                 for res in retry_results:
                     if res and res.get('slug') and res.get('detail', {}).get('lowongan'):
-                        cache[res.get('slug')] = res
-                        retry_success += 1
+                        retried_entries[res.get('slug')] = res
+                retry_success = len(retried_entries)
                 
                 if retry_success > 0:
-                    save_to_cache(cache)
+                    cache.update(retried_entries)
+                    await asyncio.to_thread(upsert_cache, retried_entries.items())
                     logger.info(f"Retry successful: {retry_success} items")
 
         # Stage 3: Save to database
         logger.info("--- STAGE 3: Saving to database ---")
         all_full_data = list(cache.values())
-        save_to_db(all_full_data, valid_ids)
+        await asyncio.to_thread(save_to_db, all_full_data, valid_ids)
         
         # Final summary
         data_with_complete_detail = [
@@ -429,4 +788,12 @@ async def main() -> None:
         raise
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    setup_logging()
+    scrape_lock = ScrapeLock()
+    if not scrape_lock.acquire():
+        logger.warning("Another scrape is already running. Exiting.")
+    else:
+        try:
+            asyncio.run(run())
+        finally:
+            scrape_lock.release() 
\ No newline at end of file
@@ -71,7 +71,20 @@ def test_lowongan_list():
     response = requests.get(f"{BASE_URL}/api/v1/lowongan?limit=5&offset=10")
     print_response(response, "Pagination Test")
     
-    return all(r.status_code == 200 for r in [response])
+    # Test 5: Cursor pagination round-trip
+    print("\n--- Test 5: Cursor pagination (next_cursor) ---")
+    first_page = requests.get(f"{BASE_URL}/api/v1/lowongan?limit=5")
+    next_cursor = first_page.json().get('next_cursor') if first_page.status_code == 200 else None
+    cursor_ok = first_page.status_code == 200
+    if next_cursor:
+        second_page = requests.get(f"{BASE_URL}/api/v1/lowongan", params={'limit': 5, 'cursor': next_cursor})
+        print_response(second_page, "Cursor Pagination Test")
+        first_ids = {item['id_lowongan'] for item in first_page.json()['data']}
+        second_ids = {item['id_lowongan'] for item in second_page.json().get('data', [])}
+        # The second page must continue after the first one, not repeat it
+        cursor_ok = second_page.status_code == 200 and not first_ids & second_ids
+    
+    return all(r.status_code == 200 for r in [response]) and cursor_ok
 
 def test_lowongan_detail():
     """Test lowongan detail endpoint"""
@@ -87,7 +100,18 @@ def test_lowongan_detail():
             
             response = requests.get(f"{BASE_URL}/api/v1/lowongan/{lowongan_id}")
             print_response(response, f"Lowongan Detail (ID: {lowongan_id})")
-            return response.status_code == 200
+            if response.status_code != 200:
+                return False
+            
+            # Conditional GET: resending the ETag must return an empty 304
+            etag = response.headers.get("ETag")
+            print(f"\n--- Conditional GET (If-None-Match: {etag}) ---")
+            cached_response = requests.get(
+                f"{BASE_URL}/api/v1/lowongan/{lowongan_id}",
+                headers={"If-None-Match": etag or ""}
+            )
+            print(f"Status Code: {cached_response.status_code}")
+            return bool(etag) and cached_response.status_code == 304
         else:
             print("❌ No lowongan data available for detail test")
             return False
@@ -95,6 +119,38 @@ def test_lowongan_detail():
         print("❌ Failed to get lowongan list for detail test")
         return False
 
+def test_lowongan_batch():
+    """Test ids batch mode of the lowongan list endpoint"""
+    print("\n📦 Testing Lowongan Batch (ids)...")
+    
+    list_response = requests.get(f"{BASE_URL}/api/v1/lowongan?limit=2")
+    if list_response.status_code != 200 or not list_response.json().get('data'):
+        print("❌ No lowongan data available for batch test")
+        return False
+    known_ids = [item['id_lowongan'] for item in list_response.json()['data']]
+    
+    # Test 1: Requested order is kept and unknown IDs are dropped
+    print("\n--- Test 1: Known IDs (reversed) plus an unknown ID ---")
+    requested = list(reversed(known_ids))
+    ids_param = ",".join(str(i) for i in [requested[0], 999999999, *requested[1:]])
+    response = requests.get(f"{BASE_URL}/api/v1/lowongan", params={'ids': ids_param})
+    print_response(response, "Batch Detail")
+    batch_ok = (
+        response.status_code == 200
+        and [item['id_lowongan'] for item in response.json()['data']] == requested
+    )
+    
+    # Test 2: Malformed and out-of-range ID lists are rejected
+    print("\n--- Test 2: Invalid ids (should return 400) ---")
+    invalid_responses = [
+        requests.get(f"{BASE_URL}/api/v1/lowongan", params={'ids': ids})
+        for ids in ("abc", "1,1000000000000000000000000000000")
+    ]
+    for invalid_response in invalid_responses:
+        print_response(invalid_response, "Invalid ids")
+    
+    return batch_ok and all(r.status_code == 400 for r in invalid_responses)
+
 def test_categories_endpoint():
     """Test categories endpoint"""
     print("\n📝 Testing Categories Endpoint...")
@@ -158,7 +214,7 @@ def test_performance():
     print("\n⚡ Testing Performance...")
     
     start_time = time.time()
-    response = requests.get(f"{BASE_URL}/api/v1/lowongan?limit=50")
+    response = requests.get(f"{BASE_URL}/api/v1/lowongan?limit=50&include_total=true")
     end_time = time.time()
     
     duration = end_time - start_time
@@ -182,6 +238,7 @@ def main():
         ("Stats Endpoint", test_stats_endpoint),
         ("Lowongan List", test_lowongan_list),
         ("Lowongan Detail", test_lowongan_detail),
+        ("Lowongan Batch", test_lowongan_batch),
         ("Categories", test_categories_endpoint),
         ("Mitras", test_mitras_endpoint),
         ("Protected Endpoint", test_protected_endpoint),